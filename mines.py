@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 
 import doctest
+from collections import deque
+from functools import lru_cache, reduce
+from itertools import chain, compress, product
+from math import prod
+from operator import add, getitem
 
 def dump(game):
     """
@@ -30,9 +35,27 @@ def new_game_2d(nrows, ncolumns, mines):
         [False, False, False, False]
         [False, False, False, False]
     """
-    dimensions = (nrows, ncolumns)
-    mines_nd = [(mine[0], mine[1]) for mine in mines]
-    return new_game_nd(dimensions, mines_nd)
+    mines_2d = {(mine[0], mine[1]) for mine in mines}
+    board = [[0] * ncolumns for _ in range(nrows)]
+    for row, col in mines_2d:
+        board[row][col] = "."
+
+    # each mine adds one to the count of every non-mine neighbor
+    for row, col in mines_2d:
+        for d_row, d_col in neighbor_offsets(2):
+            n_row, n_col = row + d_row, col + d_col
+            if 0 <= n_row < nrows and 0 <= n_col < ncolumns:
+                if board[n_row][n_col] != ".":
+                    board[n_row][n_col] += 1
+
+    return {
+        "dimensions": (nrows, ncolumns),
+        "board": board,
+        "visible": [[False] * ncolumns for _ in range(nrows)],
+        "state": "ongoing",
+        "num_safe": nrows * ncolumns - len(mines_2d),
+        "num_revealed_safe": 0,
+    }
 
 
 def check_game_state(game):
@@ -53,6 +76,35 @@ def check_game_state(game):
     return check_game_state_nd(game)
 
 
+def flood_fill_2d(game, row, col):
+    """
+    2-D specialization of flood_fill that indexes the board rows directly.
+    """
+    board = game["board"]
+    visible = game["visible"]
+    nrows, ncolumns = game["dimensions"]
+    revealed = 0
+
+    queue = deque([(row, col)])
+    while queue:
+        row, col = queue.popleft()
+        for d_row, d_col in neighbor_offsets(2):
+            n_row, n_col = row + d_row, col + d_col
+            if not (0 <= n_row < nrows and 0 <= n_col < ncolumns):
+                continue
+            if visible[n_row][n_col]:
+                continue  # already visible
+            value = board[n_row][n_col]
+            if value == ".":
+                continue  # never reveal a mine
+            visible[n_row][n_col] = True
+            revealed += 1
+            if value == 0:
+                queue.append((n_row, n_col))
+
+    return revealed
+
+
 def dig_2d(game, row, col):
     """
     >>> game = {'dimensions': (2, 4),
@@ -91,8 +143,33 @@ def dig_2d(game, row, col):
         [True, True, False, False]
         [False, False, False, False]
     """
-    coordinates = (row, col)
-    return dig_nd(game, coordinates)
+    if game["state"] != "ongoing":
+        return 0  # Return 0 if game state is not ongoing
+
+    board = game["board"]
+    visible = game["visible"]
+    if "num_safe" not in game:
+        count_safe_squares(game)
+
+    initial_value = board[row][col]
+    if initial_value == ".":
+        visible[row][col] = True
+        game["state"] = "defeat"
+        return 1
+
+    if visible[row][col]:
+        return 0
+
+    visible[row][col] = True  # Set the cell as visible
+    revealed = 1  # The initial square is revealed
+
+    if initial_value == 0:
+        revealed += flood_fill_2d(game, row, col)
+
+    game["num_revealed_safe"] += revealed
+    check_game_state_nd(game)
+
+    return revealed
 
 
 def render_2d_locations(game, all_visible=False):
@@ -109,14 +186,7 @@ def render_2d_locations(game, all_visible=False):
     >>> render_2d_locations(game, True)
     [['.', '3', '1', ' '], ['.', '.', '1', ' ']]
     """
-    render_nd_output = render_nd(game, all_visible)
-
-    def recursive_convert_to_2d(nd_output):
-        if isinstance(nd_output[0], str):
-            return nd_output
-        return [recursive_convert_to_2d(sublist) for sublist in nd_output]
-
-    return recursive_convert_to_2d(render_nd_output)
+    return render_nd(game, all_visible)
 
 
 def render_2d_board(game, all_visible=False):
@@ -129,14 +199,7 @@ def render_2d_board(game, all_visible=False):
     ...                            [False, False, True, False]]})
     '.31_\\n__1_'
     """
-    render_2d_output = render_2d_locations(game, all_visible)
-
-    def recursive_convert_to_string(output):
-        if isinstance(output[0], str):
-            return "".join(output)
-        return "\n".join([recursive_convert_to_string(sublist) for sublist in output])
-
-    return recursive_convert_to_string(render_2d_output)
+    return "\n".join("".join(row) for row in render_2d_locations(game, all_visible))
 
 
 # N-D IMPLEMENTATION
@@ -151,108 +214,77 @@ def generate_nd_board(dim, val):
         return [generate_nd_board(dim[1:], val) for _ in range(dim[0])]
 
 
+def flatten(nd_array, num_dimensions):
+    # iterate over every square in row-major order
+    for _ in range(num_dimensions - 1):
+        nd_array = chain.from_iterable(nd_array)
+    return iter(nd_array)
+
+
 def get_value(nd_array, coordinates):
-    value = nd_array
-    for coord in coordinates:
-        value = value[coord]  # sets value to a smaller and smaller list
-    return value
+    # index one dimension at a time without a Python-level loop body
+    return reduce(getitem, coordinates, nd_array)
 
 
 def set_value(nd_array, coordinates, value):
-    target = nd_array
-    for coord in coordinates[:-1]:  # all except last value of coordinates
-        target = target[coord]
-    target[coordinates[-1]] = value  # last value of coordinates
+    # walk down to the innermost list, then assign the last coordinate
+    reduce(getitem, coordinates[:-1], nd_array)[coordinates[-1]] = value
+
+
+def count_safe_squares(game):
+    """
+    Scan the whole board once to fill in the safe-square counters that
+    check_game_state_nd relies on; only needed for game dictionaries that
+    were not created by new_game_nd. Sets the state to 'defeat' if a mine
+    is already visible.
+    """
+    num_dimensions = len(game["dimensions"])
+    squares = list(flatten(game["board"], num_dimensions))
+    revealed = list(compress(squares, flatten(game["visible"], num_dimensions)))
+
+    # counting and filtering flat lists keeps the per-square work in C
+    num_revealed_mines = revealed.count(".")
+    if num_revealed_mines:
+        game["state"] = "defeat"
+
+    game["num_safe"] = len(squares) - squares.count(".")
+    game["num_revealed_safe"] = len(revealed) - num_revealed_mines
 
 
-# iterative version
 def check_game_state_nd(game):
-    dimensions = game["dimensions"]
-    num_dimensions = len(dimensions)
-    board = game["board"]
-    visible = game["visible"]
+    if "num_safe" not in game:
+        count_safe_squares(game)
 
-    num_unrevealed_squares = 0
-    num_revealed_safe_squares = 0
-    num_safe_squares = 0
-
-    def increment_indices(indices):
-        for i in range(num_dimensions - 1, -1, -1):
-            indices[i] += 1
-            if indices[i] < dimensions[i]:
-                return True  # dimension index is still within bounds, move to next coordinates
-            indices[
-                i
-            ] = 0  # dimension index is out of bounds, reset it & increment the next dimension
-        return False  # iterated through the entire board already
-
-    indices = [0] * num_dimensions
-
-    while True:
-        coords = tuple(indices)
-        value = get_value(board, coords)
-        is_visible = get_value(visible, coords)
-
-        if is_visible and value == ".":
-            game["state"] = "defeat"
-            return
-        elif not is_visible:
-            num_unrevealed_squares += 1
-
-        if value != ".":
-            num_safe_squares += 1
-            if is_visible:
-                num_revealed_safe_squares += 1
-
-        if not increment_indices(indices):
-            break  # iterated through the entire board already
+    if game["state"] == "defeat":
+        return
 
     game["state"] = (
-        "victory"
-        if num_unrevealed_squares == 0 or num_safe_squares == num_revealed_safe_squares
-        else "ongoing"
+        "victory" if game["num_revealed_safe"] == game["num_safe"] else "ongoing"
+    )
+
+
+@lru_cache(maxsize=None)
+def neighbor_offsets(num_dimensions):
+    # every combination of -1/0/+1 per dimension except staying in place
+    return tuple(
+        offset for offset in product((-1, 0, 1), repeat=num_dimensions) if any(offset)
     )
 
 
 def get_neighbors(game, coordinates):
     dimensions = game["dimensions"]
-    num_dimensions = len(dimensions)
     neighbors = []
 
-    # generate neighbors
-    def recursive_neighbors(coords, depth):
-        if depth == num_dimensions:
-            if coords != coordinates:  # Exclude the original coordinates
-                neighbors.append(coords)
-            return
-        for delta in [-1, 0, 1]:
-            new_coord = coords[depth] + delta
-            if 0 <= new_coord < dimensions[depth]:
-                recursive_neighbors(
-                    coords[:depth] + (new_coord,) + coords[depth + 1 :], depth + 1
-                )
-
-    recursive_neighbors(coordinates, 0)
+    for offset in neighbor_offsets(len(dimensions)):
+        neighbor = tuple(map(add, coordinates, offset))
+        if all(0 <= coord < dim for coord, dim in zip(neighbor, dimensions)):
+            neighbors.append(neighbor)
+
     return neighbors
 
 
 def get_all_coordinates(game):
-    dimensions = game["dimensions"]
-    num_dimensions = len(dimensions)
-    coordinates = []
-
-    # generate coordinates
-    def recursive_coordinates(coords, depth):
-        if depth == num_dimensions:
-            coordinates.append(coords)
-            return
-        for i in range(dimensions[depth]):
-            recursive_coordinates(
-                coords[:depth] + (i,) + coords[depth + 1 :], depth + 1
-            )
-
-    recursive_coordinates((), 0)
-    return coordinates
+    return list(product(*(range(dim) for dim in game["dimensions"])))
 
 
 def new_game_nd(dimensions, mines):
@@ -274,32 +306,59 @@ def new_game_nd(dimensions, mines):
     new_board = generate_nd_board(dimensions, 0)
     visible = generate_nd_board(dimensions, False)
 
-    # set the mine locations on the board
+    # set the mine locations on the board; coordinates may arrive as lists
+    mines = {tuple(mine) for mine in mines}
     for mine in mines:
         set_value(new_board, mine, ".")
 
-    # mine counts for each location on the board
-    all_coords = get_all_coordinates(
-        {"dimensions": dimensions}
-    )  # Get all coordinates in the board
-    for coords in all_coords:
-        if get_value(new_board, coords) != ".":  # Skip mine locations
-            neighbors = get_neighbors(
-                {"dimensions": dimensions}, coords
-            )  # neighboring coordinates
-            mine_count = sum(
-                get_value(new_board, neighbor) == "." for neighbor in neighbors
-            )  # count neighboring mines
-            set_value(new_board, coords, mine_count)  # Update board with mine count
+    # mine counts: each mine adds one to every non-mine neighbor, so only
+    # the cells around mines are visited instead of the whole board
+    for mine in mines:
+        for neighbor in get_neighbors({"dimensions": dimensions}, mine):
+            value = get_value(new_board, neighbor)
+            if value != ".":
+                set_value(new_board, neighbor, value + 1)
 
     return {
         "dimensions": dimensions,
         "board": new_board,
         "visible": visible,
         "state": "ongoing",
+        "num_safe": prod(dimensions) - len(mines),
+        "num_revealed_safe": 0,
     }
 
 
+def flood_fill(game, start):
+    """
+    Reveal every square reachable from the 0 square at start, expanding
+    breadth-first through further 0 squares. Returns the number of newly
+    revealed squares, not counting start itself.
+    """
+    board = game["board"]
+    visible = game["visible"]
+    revealed = 0
+
+    # cells are marked visible as they are queued so each one is enqueued
+    # at most once; each neighbor's innermost row is looked up only once
+    queue = deque([start])
+    while queue:
+        for neighbor in get_neighbors(game, queue.popleft()):
+            prefix, last = neighbor[:-1], neighbor[-1]
+            visible_row = get_value(visible, prefix)
+            if visible_row[last]:
+                continue  # already visible
+            value = get_value(board, prefix)[last]
+            if value == ".":
+                continue  # never reveal a mine
+            visible_row[last] = True
+            revealed += 1
+            if value == 0:
+                queue.append(neighbor)
+
+    return revealed
+
+
 def dig_nd(game, coordinates):
     """
     Recursively dig up square at coords and neighboring squares.
@@ -348,7 +407,8 @@ def dig_nd(game, coordinates):
 
     board = game["board"]
     visible = game["visible"]
-    check_game_state_nd(game)
+    if "num_safe" not in game:
+        count_safe_squares(game)
 
     initial_value = get_value(board, coordinates)
     if initial_value == ".":
@@ -362,31 +422,32 @@ def dig_nd(game, coordinates):
     set_value(visible, coordinates, True)  # Set the cell as visible
     revealed = 1  # The initial square is revealed
 
-    def recursive_dig(coords):
-        current_revealed = 0
-        value = get_value(board, coords)
-        if get_value(visible, coords) or value == ".":
-            return 0  # Return if square is already visible or is a mine
+    if initial_value == 0:
+        revealed += flood_fill(game, coordinates)
+
+    game["num_revealed_safe"] += revealed
+    check_game_state_nd(game)
 
-        # Reveal the current square
-        set_value(visible, coords, True)
-        current_revealed += 1
+    return revealed
 
-        # Recursively dig neighbors if current square value is 0
-        if value == 0:
-            for neighbor in get_neighbors(game, coords):
-                current_revealed += recursive_dig(neighbor)
 
-        return current_revealed
+def display_board(game):
+    """
+    Return the display string of every square, in the same nested layout
+    as the board. The board never changes after creation, so the strings
+    are built once and cached in the game dictionary.
+    """
+    if "display" not in game:
+        last_depth = len(game["dimensions"]) - 1
 
-    # If the value at the initial coordinates is 0, start recursive digging for its neighbors
-    if initial_value == 0:
-        for neighbor in get_neighbors(game, coordinates):
-            revealed += recursive_dig(neighbor)
+        def recursive_convert(board, depth):
+            if depth == last_depth:
+                return [" " if value == 0 else str(value) for value in board]
+            return [recursive_convert(sub_board, depth + 1) for sub_board in board]
 
-    check_game_state_nd(game)
+        game["display"] = recursive_convert(game["board"], 0)
 
-    return revealed
+    return game["display"]
 
 
 def render_nd(game, all_visible=False):
@@ -409,29 +470,26 @@ def render_nd(game, all_visible=False):
      [['.', '3'], ['3', '.'], ['1', '1'], [' ', ' ']]]
     """
 
-    def recursive_render(board, visible, coords=()):
-        # Base case: if all dimensions are specified, return value at coords
-        if len(coords) == len(game["dimensions"]):
-            value = get_value(board, coords)
-            is_visible = get_value(visible, coords)
-            if all_visible or is_visible:
-                if value == 0:
-                    return " "
-                elif value == ".":
-                    return "."
-                else:
-                    return str(value)
-            else:
-                return "_"
-        # Recursive case: build list by traversing the next dimension
-        else:
+    display = display_board(game)
+    last_depth = len(game["dimensions"]) - 1
+
+    def recursive_render(display, visible, depth):
+        # Base case: innermost lists hold the cells themselves
+        if depth == last_depth:
+            if all_visible:
+                return list(display)
             return [
-                recursive_render(board, visible, coords + (i,))
-                for i in range(game["dimensions"][len(coords)])
+                cell if is_visible else "_"
+                for cell, is_visible in zip(display, visible)
             ]
+        # Recursive case: walk the next dimension of both arrays together
+        return [
+            recursive_render(sub_display, sub_visible, depth + 1)
+            for sub_display, sub_visible in zip(display, visible)
+        ]
 
     # Start recursive rendering at top level
-    return recursive_render(game["board"], game["visible"])
+    return recursive_render(display, game["visible"], 0)
 
 
 if __name__ == "__main__":
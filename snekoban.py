@@ -1,3 +1,6 @@
+from heapq import heappop, heappush
+from itertools import count
+
 direction_vector = {
     "up": (-1, 0),
     "down": (+1, 0),
@@ -10,9 +13,11 @@ def new_game(level_description):
     num_rows = len(level_description)
     num_cols = len(level_description[0])
     player_position = None
-    targets = set()
-    computers = set()
-    walls = set()
+    # walls, targets and computers are bitboards: bit `position` is set
+    # when that square holds the item
+    targets = 0
+    computers = 0
+    walls = 0
 
     board = []
     for i, row in enumerate(level_description):
@@ -21,14 +26,16 @@ def new_game(level_description):
             new_cell = set(cell)
             new_row.append(new_cell)
 
+            # positions are packed into a single int: row * num_cols + col
+            position = i * num_cols + j
             if "player" in new_cell:
-                player_position = (i, j)
+                player_position = position
             if "target" in new_cell:
-                targets.add((i, j))
+                targets |= 1 << position
             if "computer" in new_cell:
-                computers.add((i, j))
+                computers |= 1 << position
             if "wall" in new_cell:
-                walls.add((i, j))
+                walls |= 1 << position
 
         board.append(tuple(new_row))
 
@@ -40,6 +47,26 @@ def new_game(level_description):
         "computers": computers,
         "board_columns": num_cols,
         "board_rows": num_rows,
+        "direction_offsets": {
+            direction: row_delta * num_cols + col_delta
+            for direction, (row_delta, col_delta) in direction_vector.items()
+        },
+        "board_edges": board_edges(num_rows, num_cols),
+    }
+
+
+def board_edges(num_rows, num_cols):
+    """
+    For each direction, a bitboard of the squares from which a step in that
+    direction would leave the board.
+    """
+    top_row = (1 << num_cols) - 1
+    left_column = sum(1 << row * num_cols for row in range(num_rows))
+    return {
+        "up": top_row,
+        "down": top_row << (num_rows - 1) * num_cols,
+        "left": left_column,
+        "right": left_column << num_cols - 1,
     }
 
 
@@ -47,108 +74,190 @@ def victory_check(game):
     if not game["targets"] or not game["computers"]:
         return False
 
-    return game["targets"].issubset(game["computers"])
+    return game["targets"] & ~game["computers"] == 0
 
 
-def step_game(game, direction):
-    player_position = game["player_position"]
-    computers = set(game["computers"])
-    targets = set(game["targets"])
-    walls = set(game["walls"])
+def bit_positions(bits):
+    """
+    Yield the position of every set bit in a bitboard, lowest first.
+    """
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
 
-    delta = direction_vector[direction]
-    new_position = (player_position[0] + delta[0], player_position[1] + delta[1])
 
-    if new_position in walls:
+def step_game(game, direction):
+    player_position = game["player_position"]
+    # walls and targets never change, so every state shares the same
+    # objects; computers is replaced only when a push moves one
+    computers = game["computers"]
+    walls = game["walls"]
+
+    # a packed offset would wrap around at the sides of the board, so the
+    # edge of the board blocks moves just like a wall does
+    edges = game["board_edges"][direction]
+    delta = game["direction_offsets"][direction]
+    new_position = player_position + delta
+
+    if edges >> player_position & 1 or walls >> new_position & 1:
         return game
 
-    if new_position not in computers:  # if there is an open space for the player
+    if not computers >> new_position & 1:  # if there is an open space for the player
         player_position = new_position
     else:  # if there is a computer in the new_position
-        computer_new_position = (new_position[0] + delta[0], new_position[1] + delta[1])
-        # if the computer's new position is in bounds /
-        #  there is not a wall or computer in its new position
+        computer_new_position = new_position + delta
+        # if the computer stays on the board and there is not a wall or
+        #  computer in its new position
         if (
-            computer_new_position not in walls
-            and computer_new_position not in computers
+            not edges >> new_position & 1
+            and not (walls | computers) >> computer_new_position & 1
         ):
-            computers.remove(new_position)
-            computers.add(computer_new_position)
+            computers ^= 1 << new_position | 1 << computer_new_position
 
             player_position = new_position
         else:
             return game
 
-    return {
-        "walls": walls,
-        "player_position": player_position,
-        "targets": targets,
-        "computers": computers,
-        "board_columns": game["board_columns"],
-        "board_rows": game["board_rows"],
-    }
+    # every other field is carried over from game by reference
+    return dict(game, player_position=player_position, computers=computers)
 
 
 def dump_game(game):
     num_cols = game["board_columns"]
     num_rows = game["board_rows"]
 
-    computers = set(game["computers"])
-    targets = set(game["targets"])
-    walls = set(game["walls"])
     player = game["player_position"]
 
-    items = [(computers, "computer"), (targets, "target"), (walls, "wall")]
-
-    board = []
+    items = [
+        (game["computers"], "computer"),
+        (game["targets"], "target"),
+        (game["walls"], "wall"),
+    ]
 
     # create empty board
-    for _ in range(num_rows):
-        row_list = []
-        for _ in range(num_cols):
-            col_list = []
-            row_list.append(col_list)
-        board.append(row_list)
+    board = [[[] for _ in range(num_cols)] for _ in range(num_rows)]
 
     # start to populate the board
-    board[player[0]][player[1]].append("player")
-    for sets, name in items:
-        for x_loc, y_loc in sets:
+    player_row, player_col = divmod(player, num_cols)
+    board[player_row][player_col].append("player")
+    for bits, name in items:
+        for position in bit_positions(bits):
+            x_loc, y_loc = divmod(position, num_cols)
             board[x_loc][y_loc].append(name)
 
     return board
 
 
+def dead_squares(game):
+    """
+    Bitboard of the open, non-target squares that are wedged into a corner
+    by walls; a computer pushed onto one of them can never be moved again.
+    """
+    num_cols = game["board_columns"]
+    num_rows = game["board_rows"]
+    walls = game["walls"]
+    blocked = walls | game["targets"]
+
+    dead = 0
+    for row in range(1, num_rows - 1):
+        for col in range(1, num_cols - 1):
+            position = row * num_cols + col
+            if blocked >> position & 1:
+                continue
+            above, below = position - num_cols, position + num_cols
+            vertical = (walls >> above | walls >> below) & 1
+            horizontal = (walls >> (position - 1) | walls >> (position + 1)) & 1
+            if vertical and horizontal:
+                dead |= 1 << position
+
+    return dead
+
+
+def target_distances(game):
+    """
+    For every packed position, the Manhattan distance to the nearest target.
+    """
+    num_cols = game["board_columns"]
+    num_rows = game["board_rows"]
+    targets = [
+        divmod(position, num_cols) for position in bit_positions(game["targets"])
+    ]
+
+    return [
+        min(abs(row - t_row) + abs(col - t_col) for t_row, t_col in targets)
+        for row in range(num_rows)
+        for col in range(num_cols)
+    ]
+
+
 def solve_puzzle(game):
     if victory_check(game):
         return []
 
-    queue = [(game, [])]
-    visited = {(game["player_position"], frozenset(game["computers"]))}
-
-    while queue:
-        current_game, current_path = queue.pop(0)
-
-        for move in ["up", "down", "left", "right"]:
-            next_game = step_game(current_game, move)
+    if not game["targets"]:
+        return None
+
+    # corner squares are only fatal when every computer must end up on a
+    # target; spare computers may be left anywhere
+    num_computers = bin(game["computers"]).count("1")
+    all_on_targets = num_computers == bin(game["targets"]).count("1")
+    dead = dead_squares(game) if all_on_targets else 0
+    if game["computers"] & dead:
+        return None
+
+    # A* search: every move shifts at most one computer by one square, so
+    # when each computer must end on a target the summed distance from each
+    # computer to its nearest target never overestimates the remaining moves
+    # and the first solution popped is the shortest one. Spare computers
+    # never have to move, so with extra computers the bound is just 0.
+    distances = target_distances(game)
+    heuristics = {}
+
+    def heuristic(computers):
+        if not all_on_targets:
+            return 0
+        if computers not in heuristics:
+            heuristics[computers] = sum(
+                distances[position] for position in bit_positions(computers)
+            )
+        return heuristics[computers]
 
-            for x, y in next_game["computers"]:
-                if not (x, y) in next_game["targets"]:
-                    continue
+    tie_breaker = count()
+    heap = [(heuristic(game["computers"]), 0, next(tie_breaker), game, [])]
+    best_costs = {(game["player_position"], game["computers"]): 0}
 
-            game_hash = (
-                next_game["player_position"],
-                frozenset(next_game["computers"]),
-            )
+    while heap:
+        _, negative_cost, _, current_game, current_path = heappop(heap)
+        if victory_check(current_game):
+            return current_path
 
-            if game_hash not in visited:
-                visited.add(game_hash)
-                new_path = current_path + [move]
+        current_hash = (current_game["player_position"], current_game["computers"])
+        if best_costs[current_hash] < -negative_cost:
+            continue  # a cheaper route to this state was already expanded
 
-                if victory_check(next_game):
-                    return new_path
+        cost = -negative_cost + 1
+        for move in ["up", "down", "left", "right"]:
+            next_game = step_game(current_game, move)
 
-                queue.append((next_game, new_path))
+            if next_game["computers"] & dead:
+                continue  # a computer is stuck in a corner off its target
+
+            game_hash = (next_game["player_position"], next_game["computers"])
+
+            if cost < best_costs.get(game_hash, cost + 1):
+                best_costs[game_hash] = cost
+                priority = cost + heuristic(next_game["computers"])
+                heappush(
+                    heap,
+                    (
+                        priority,
+                        -cost,  # prefer deeper states among equal priorities
+                        next(tie_breaker),
+                        next_game,
+                        current_path + [move],
+                    ),
+                )
 
     return None
 